@@ -3,10 +3,12 @@ Refactored tests for Kraken WebSocket client.
 Matches the current KrakenClient implementation.
 """
 import json
+import ssl
 from decimal import Decimal
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+import websockets
 
 from traid.kraken_client import KrakenClient
 
@@ -34,11 +36,11 @@ class MockWebSocket:
         """Record sent messages."""
         self.sent_messages.append(message)
 
-    async def recv(self):
+    async def recv(self, decode=None):
         """Simulate a simple recv if needed."""
         # Could simulate incoming messages here if you want to test _process_message
         await asyncio.sleep(0.01)
-        return ""
+        return b""
 
     async def close(self):
         self.open = False
@@ -69,6 +71,27 @@ async def test_connect(client, monkeypatch):
     assert client.ws == mock_ws
 
 
+@pytest.mark.asyncio
+async def test_close_stops_message_handler(client, monkeypatch):
+    """Test that close() cancels and awaits the single message handler task."""
+    mock_ws = MockWebSocket()
+
+    async def mock_connect(*args, **kwargs):
+        return mock_ws
+
+    monkeypatch.setattr('websockets.connect', mock_connect)
+
+    await client.connect()
+    handler_task = client._message_handler_task
+    await client.connect()
+    assert client._message_handler_task is handler_task
+
+    await client.close()
+    assert handler_task.done()
+    assert client._message_handler_task is None
+    assert mock_ws.open is False
+
+
 @pytest.mark.asyncio
 async def test_subscribe_prices(client, test_symbol, monkeypatch):
     """
@@ -97,6 +120,31 @@ async def test_subscribe_prices(client, test_symbol, monkeypatch):
     assert formatted_symbol in sent_message.get('pair', [])
 
 
+@pytest.mark.asyncio
+async def test_connect_resubscribes_in_one_frame(client, monkeypatch):
+    """Test that subscribing and reconnecting send a single batched frame."""
+    sockets = []
+
+    async def mock_connect(*args, **kwargs):
+        sockets.append(MockWebSocket())
+        return sockets[-1]
+
+    monkeypatch.setattr('websockets.connect', mock_connect)
+
+    await client.connect()
+    await client.subscribe_prices(["BTC/USD", "ETH/USD", "BTC/USD"])
+    await client.connect()
+
+    assert len(sockets) == 2
+    assert len(sockets[0].sent_messages) == 1
+    assert json.loads(sockets[0].sent_messages[0])["pair"] == ["XBT/USD", "ETH/USD"]
+    assert sockets[1].sent_messages == sockets[0].sent_messages
+
+    frame = client._resubscribe_frame
+    await client.connect()
+    assert sockets[2].sent_messages[0] is frame
+
+
 @pytest.mark.asyncio
 async def test_process_message_ticker_update(client, test_symbol, monkeypatch):
     """Test processing a ticker WebSocket message."""
@@ -140,6 +188,159 @@ async def test_process_message_ticker_update(client, test_symbol, monkeypatch):
     assert callback_called is True, "on_price_update should have been called."
     assert callback_data["symbol"] == "BTC/USDT"
     assert callback_data["data"]["price"] == Decimal("50000.00000")
+    assert callback_data["data"]["volume"] == 10.0
+
+    # Raw bytes frames from recv(decode=False) parse the same way
+    first_entry = callback_data["data"]
+    callback_data = None
+    await client._process_message(ticker_message.replace("50000.00000", "50100.00000", 1).encode())
+    assert callback_data["symbol"] == "BTC/USDT"
+    assert callback_data["data"] is first_entry, "Cache slot should be updated in place."
+
+    latest = client.get_latest_price("BTC/USDT")
+    assert isinstance(latest, Decimal)
+    assert latest == Decimal("50100.00000")
+
+
+@pytest.mark.asyncio
+async def test_message_handler_reconnects_after_close(client, monkeypatch):
+    """Test that the handler reads raw frames and reconnects once the socket closes."""
+    class ClosingWebSocket:
+        def __init__(self, frames):
+            self._frames = list(frames)
+            self.decode_args = []
+
+        async def recv(self, decode=None):
+            self.decode_args.append(decode)
+            if not self._frames:
+                raise websockets.exceptions.ConnectionClosedOK(None, None)
+            return self._frames.pop(0)
+
+    async def mock_connect():
+        client.running = False
+        return True
+
+    client.ws = ClosingWebSocket([b"frame-1", b"frame-2"])
+    client.running = True
+    client._process_message = AsyncMock()
+    client.connect = AsyncMock(side_effect=mock_connect)
+    monkeypatch.setattr('asyncio.sleep', AsyncMock())
+
+    await client._message_handler()
+
+    assert [c.args[0] for c in client._process_message.await_args_list] == [b"frame-1", b"frame-2"]
+    assert set(client.ws.decode_args) == {False}
+    client.connect.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_reconnect_backs_off_until_connected(client, monkeypatch):
+    """Test that reconnects keep retrying with capped, jittered delays."""
+    delays = []
+
+    async def mock_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr('asyncio.sleep', mock_sleep)
+    client.running = True
+    client.connect = AsyncMock(side_effect=[False] * 9 + [True])
+
+    assert await client._reconnect() is True
+    assert client.connect.await_count == 10
+    for attempt, delay in enumerate(delays):
+        base = min(2 ** attempt, client.MAX_RECONNECT_DELAY)
+        assert 0.5 * base <= delay <= 1.5 * base
+
+    # A later outage starts again from the shortest delay
+    delays.clear()
+    client.connect = AsyncMock(return_value=True)
+    assert await client._reconnect() is True
+    assert 0.5 <= delays[0] <= 1.5
+
+
+@pytest.mark.asyncio
+async def test_reconnect_stops_when_client_closes(client, monkeypatch):
+    """Test that reconnect attempts end once the client is stopped."""
+    monkeypatch.setattr('asyncio.sleep', AsyncMock())
+    client.running = True
+
+    async def failing_connect():
+        if client.connect.await_count == 3:
+            client.running = False
+        return False
+
+    client.connect = AsyncMock(side_effect=failing_connect)
+
+    assert await client._reconnect() is False
+    assert client.connect.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_process_message_uses_subscribed_symbol(client, monkeypatch):
+    """Test that ticker updates are keyed by the symbol the caller subscribed with."""
+    async def mock_connect(*args, **kwargs):
+        return MockWebSocket()
+
+    monkeypatch.setattr('websockets.connect', mock_connect)
+    await client.subscribe_prices(["XBT/EUR"])
+
+    updates = []
+    client.on_price_update = updates.append
+    await client._process_message('[7,{"c":["60000.0","1"],"v":["1","2"],"l":["1","2"],"h":["1","2"]},"ticker","XBT/EUR"]')
+
+    assert updates[0]["symbol"] == "XBT/EUR"
+    assert client.get_latest_price("XBT/EUR") == Decimal("60000.0")
+
+
+@pytest.mark.asyncio
+async def test_process_message_ignores_other_frames(client):
+    """Test that control frames and unknown channels never reach the callback."""
+    client.on_price_update = MagicMock()
+
+    for frame in (
+        '{"event":"heartbeat"}',
+        '{"event":"subscriptionStatus","status":"subscribed","pair":"XBT/USDT"}',
+        '[42,{"a":[]},"spread","XBT/USDT"]',
+        '[42,"ticker"]',
+    ):
+        await client._process_message(frame)
+
+    client.on_price_update.assert_not_called()
+    assert client.price_data == {}
+
+
+@pytest.mark.asyncio
+async def test_process_message_skips_unchanged_ticks(client):
+    """Test that a ticker frame repeating the last price and volume is ignored."""
+    client.on_price_update = MagicMock()
+    frame = '[42,{"c":["100.0","1"],"v":["5","50"],"l":["90","90"],"h":["110","110"]},"ticker","ETH/USDT"]'
+
+    await client._process_message(frame)
+    await client._process_message(frame)
+    assert client.on_price_update.call_count == 1
+
+    await client._process_message(frame.replace('"50"', '"51"'))
+    assert client.on_price_update.call_count == 2
+    assert client.price_data["ETH/USDT"]["volume"] == 51.0
+
+
+@pytest.mark.asyncio
+async def test_process_message_skips_heartbeat_parse(client, monkeypatch):
+    """Test that heartbeat frames are dropped before JSON decoding."""
+    mock_loads = MagicMock()
+    monkeypatch.setattr('traid.kraken_client._json_loads', mock_loads)
+
+    await client._process_message(b'{"event":"heartbeat"}')
+    await client._process_message('{"event":"heartbeat"}')
+
+    mock_loads.assert_not_called()
+
+
+def test_ssl_context_verifies_certificates(client):
+    """Test that the shared SSL context keeps certificate verification on."""
+    assert client._ssl_context.verify_mode == ssl.CERT_REQUIRED
+    assert client._ssl_context.check_hostname is True
+    assert client._ssl_context is client._ssl_context
 
 
 def test_format_symbol(client):
@@ -182,8 +383,8 @@ async def test_fetch_historical_data(client, monkeypatch):
             self.status = status
             self._data = data or {}
 
-        async def json(self):
-            return self._data
+        async def read(self):
+            return json.dumps(self._data).encode()
 
         async def __aenter__(self):
             # This is called by: `async with session.get(...) as response:`
@@ -218,18 +419,13 @@ async def test_fetch_historical_data(client, monkeypatch):
     class MockSession:
         """Pretend aiohttp.ClientSession that yields `mock_response` on session.get(...)."""
 
-        async def __aenter__(self):
-            # This is called by: `async with aiohttp.ClientSession() as session:`
-            return self
-
-        async def __aexit__(self, exc_type, exc_val, exc_tb):
-            pass
+        closed = False
 
-        def get(self, url, params=None, ssl=None):
+        def get(self, url, params=None):
             """
             Called by:
-              async with session.get(endpoint, params=params, ssl=ssl_context) as response:
-                  data = await response.json()
+              async with session.get(endpoint, params=params) as response:
+                  data = _json_loads(await response.read())
             Must return an object that supports `async with ...`.
             """
             return mock_response
@@ -266,15 +462,15 @@ async def test_fetch_historical_data(client, monkeypatch):
     assert candle0["volume"] == 10.12345678
 
 @pytest.mark.asyncio
-async def test_fetch_historical_data_http_error(client, monkeypatch):
+async def test_fetch_historical_data_http_error(client, monkeypatch, caplog):
     """Test handling of HTTP error status when fetching historical data."""
     class MockResponse:
         def __init__(self, status=500, data=None):
             self.status = status
             self._data = data or {}
 
-        async def json(self):
-            return self._data
+        async def read(self):
+            return json.dumps(self._data).encode()
 
         async def __aenter__(self):
             return self
@@ -283,31 +479,29 @@ async def test_fetch_historical_data_http_error(client, monkeypatch):
             pass
 
     mock_response = MockResponse(status=500)
-    mock_session = AsyncMock()
+    mock_session = MagicMock(closed=False)
     mock_session.get.return_value.__aenter__.return_value = mock_response
 
-    mock_client_session = AsyncMock()
-    mock_client_session.__aenter__.return_value = mock_session
-
-    monkeypatch.setattr('aiohttp.ClientSession', lambda: mock_client_session)
+    monkeypatch.setattr('aiohttp.ClientSession', lambda *args, **kwargs: mock_session)
 
     symbols = ["BTC/USDT"]
     data = await client.fetch_historical_data(symbols, interval=5)
     # The client returns an empty dictionary on error
     assert isinstance(data, dict)
     assert not data, "Data should be empty when HTTP error occurs."
+    assert "HTTP 500" in caplog.text
 
 
 @pytest.mark.asyncio
-async def test_fetch_historical_data_api_error(client, monkeypatch):
+async def test_fetch_historical_data_api_error(client, monkeypatch, caplog):
     """Test handling of an API-level error response from Kraken."""
     class MockResponse:
         def __init__(self, status=200, data=None):
             self.status = status
             self._data = data or {}
 
-        async def json(self):
-            return self._data
+        async def read(self):
+            return json.dumps(self._data).encode()
 
         async def __aenter__(self):
             return self
@@ -321,35 +515,89 @@ async def test_fetch_historical_data_api_error(client, monkeypatch):
         "result": {}
     }
     mock_response = MockResponse(data=mock_data)
-    mock_session = AsyncMock()
+    mock_session = MagicMock(closed=False)
     mock_session.get.return_value.__aenter__.return_value = mock_response
 
-    mock_client_session = AsyncMock()
-    mock_client_session.__aenter__.return_value = mock_session
-
-    monkeypatch.setattr('aiohttp.ClientSession', lambda: mock_client_session)
+    monkeypatch.setattr('aiohttp.ClientSession', lambda *args, **kwargs: mock_session)
 
     symbols = ["BTC/USDT"]
     data = await client.fetch_historical_data(symbols, interval=5)
     assert isinstance(data, dict)
     assert not data, "Expect empty data when Kraken returns API-level error."
+    assert "EGeneral:Invalid arguments" in caplog.text
 
 
 @pytest.mark.asyncio
 async def test_fetch_historical_data_exception(client, monkeypatch):
     """Test handling of network/other exceptions when fetching historical data."""
-    async def mock_get(*args, **kwargs):
-        raise Exception("Network error")
-
-    mock_session = AsyncMock()
-    mock_session.get.side_effect = mock_get
-
-    mock_client_session = AsyncMock()
-    mock_client_session.__aenter__.return_value = mock_session
+    mock_session = MagicMock(closed=False)
+    mock_session.get.side_effect = Exception("Network error")
 
-    monkeypatch.setattr('aiohttp.ClientSession', lambda: mock_client_session)
+    monkeypatch.setattr('aiohttp.ClientSession', lambda *args, **kwargs: mock_session)
 
     symbols = ["BTC/USDT"]
     data = await client.fetch_historical_data(symbols, interval=5)
     assert isinstance(data, dict)
     assert not data, "Expect empty data on exception."
+
+
+@pytest.mark.asyncio
+async def test_fetch_historical_data_reuses_session(client, monkeypatch):
+    """Test that REST calls share one session until the client is closed."""
+    sessions = []
+    timeouts = []
+
+    def mock_client_session_constructor(*args, **kwargs):
+        timeouts.append(kwargs.get("timeout"))
+        session = MagicMock(closed=False)
+        session.close = AsyncMock()
+        session.get.side_effect = Exception("Network error")
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr('aiohttp.ClientSession', mock_client_session_constructor)
+
+    await client.fetch_historical_data(["BTC/USDT", "ETH/USDT"], interval=5)
+    await client.fetch_historical_data(["BTC/USDT"], interval=5)
+    assert len(sessions) == 1
+    assert sessions[0].get.call_count == 3
+    assert timeouts[0].total == client.REST_TIMEOUT
+
+    await client.close()
+    sessions[0].close.assert_awaited_once()
+    assert client._http_session is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_historical_data_concurrent(client, monkeypatch):
+    """Test that symbols are fetched concurrently up to the configured limit."""
+    in_flight = 0
+    max_in_flight = 0
+
+    class MockResponse:
+        status = 200
+
+        async def read(self):
+            return b'{"error":[],"result":{"PAIR":[[1,"1","2","0.5","1.5","1","10",5]]}}'
+
+        async def __aenter__(self):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            return self
+
+        async def __aexit__(self, exc_type, exc_val, exc_tb):
+            nonlocal in_flight
+            in_flight -= 1
+
+    mock_session = MagicMock(closed=False)
+    mock_session.get.side_effect = lambda *args, **kwargs: MockResponse()
+    monkeypatch.setattr('aiohttp.ClientSession', lambda *args, **kwargs: mock_session)
+    monkeypatch.setattr(KrakenClient, 'MAX_CONCURRENT_REQUESTS', 2)
+
+    symbols = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT", "ADA/USDT"]
+    data = await client.fetch_historical_data(symbols, interval=5)
+
+    assert list(data) == symbols
+    assert max_in_flight == 2
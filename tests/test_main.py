@@ -0,0 +1,89 @@
+"""Tests for the trading bot entry point helpers."""
+import importlib
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+TRAID_DIR = Path(__file__).resolve().parent.parent / "traid"
+
+
+@pytest.fixture
+def main(monkeypatch):
+    """Import main.py the way it runs, as a script beside its sibling modules."""
+    monkeypatch.syspath_prepend(str(TRAID_DIR))
+    preloaded = set(sys.modules)
+    yield importlib.import_module("main")
+    # Drop the script-style imports so they don't shadow the traid package modules
+    for name in ("main", "kraken_client", "trading_bot"):
+        if name not in preloaded:
+            sys.modules.pop(name, None)
+
+
+class MockResponse:
+    def __init__(self, payload, status=200):
+        self.status = status
+        self._payload = payload
+
+    async def read(self):
+        return json.dumps(self._payload).encode()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class MockSession:
+    def __init__(self, response):
+        self._response = response
+
+    def get(self, url):
+        return self._response
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_get_all_kraken_pairs_filters_usdt_pairs(main, monkeypatch):
+    """Test that only non-stable USDT-quoted pairs are kept from AssetPairs."""
+    payload = {
+        "error": [],
+        "result": {
+            "XBTUSDT": {"base": "XXBT", "quote": "USDT"},
+            "DOTUSDT": {"base": "DOT", "quote": "USDT"},
+            "USDCUSDT": {"base": "USDC", "quote": "USDT"},
+            "USDTZUSD": {"base": "USDT", "quote": "ZUSD"},
+            "XETHZUSD": {"base": "XETH", "quote": "ZUSD"},
+            "LONGNAMEUSDT": {"base": "VERYLONGNAME", "quote": "USDT"},
+        }
+    }
+    response = MockResponse(payload)
+    monkeypatch.setattr(main.aiohttp, "ClientSession", lambda *args, **kwargs: MockSession(response))
+
+    pairs = await main.get_all_kraken_pairs()
+
+    assert pairs[:2] == ["XXBT/USDT", "DOT/USDT"]
+    assert "USDC/USDT" not in pairs
+    assert "USDT/ZUSD" not in pairs
+    assert "XETH/ZUSD" not in pairs
+    assert "VERYLONGNAME/USDT" not in pairs
+    # Major pairs missing from the response are appended
+    assert "BTC/USDT" in pairs and "ETH/USDT" in pairs
+
+
+@pytest.mark.asyncio
+async def test_get_all_kraken_pairs_http_error(main, monkeypatch):
+    """Test that a failed AssetPairs request falls back to the default set."""
+    response = MockResponse({}, status=503)
+    monkeypatch.setattr(main.aiohttp, "ClientSession", lambda *args, **kwargs: MockSession(response))
+
+    pairs = await main.get_all_kraken_pairs()
+
+    assert pairs == ["BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT", "ADA/USDT"]
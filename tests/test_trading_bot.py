@@ -105,6 +105,10 @@ class TestTradingBot:
             trading_bot.client.subscribe_prices.assert_called_once_with(['BTC/USDT', 'ETH/USDT', 'XRP/USDT'])
             trading_bot.client.fetch_historical_data.assert_called_once()
 
+            history = trading_bot.coin_data['BTC/USDT']
+            assert list(history['prices']) == [100, 105]
+            assert history['prices'].maxlen == trading_bot.HISTORY_LENGTH
+
     @pytest.mark.asyncio
     async def test_stop(self, trading_bot):
         """Test bot shutdown process."""
@@ -189,6 +193,21 @@ class TestTradingBot:
         assert 0 <= scores['BTC/USDT'] <= 100
         assert 0 <= scores['ETH/USDT'] <= 100
 
+    def test_calculate_opportunity_scores_skips_unchanged(self, trading_bot):
+        """Test that only symbols with new data are rescored."""
+        for i in range(20):
+            trading_bot._update_coin_data('BTC/USDT', 100 + i, 10)
+            trading_bot._update_coin_data('ETH/USDT', 20 + i, 10)
+        trading_bot._calculate_opportunity_scores()
+
+        trading_bot._update_coin_data('ETH/USDT', 50, 10)
+        with patch.object(trading_bot, '_calculate_coin_score', return_value=42) as mock_score:
+            scores = trading_bot._calculate_opportunity_scores()
+
+        assert [c.args[0] for c in mock_score.call_args_list] == ['ETH/USDT']
+        assert scores['ETH/USDT'] == 42
+        assert 'BTC/USDT' in scores
+
     def test_calculate_rsi(self, trading_bot):
         """Test RSI calculation."""
         prices = np.array([100, 102, 104, 103, 105, 107, 109, 108, 110, 112,
@@ -1,17 +1,46 @@
 """Simplified Kraken WebSocket client for real-time market data."""
 import json
+import logging
+import operator
+import random
 import ssl
 import websockets
 import asyncio
 import aiohttp
-from typing import Dict, List, Optional, Callable, Set
+from functools import cached_property, lru_cache
+from typing import Dict, List, Optional, Callable, Set, Union
 from decimal import Decimal
 import time
 
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:  # orjson is optional, fall back to the stdlib codec
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+logger = logging.getLogger(__name__)
+
+# Kraken sends this roughly once a second when a channel is quiet
+_HEARTBEAT_FRAMES = (b'{"event":"heartbeat"}', '{"event":"heartbeat"}')
+
+# Last trade, volume, low and high fields of a ticker payload
+_TICKER_FIELDS = operator.itemgetter("c", "v", "l", "h")
+
+@lru_cache(maxsize=1024)
+def _to_decimal(value: float) -> Decimal:
+    """Convert a cached float price to Decimal, reusing results for repeated prices."""
+    return Decimal(str(value))
+
 class KrakenClient:
     """Client for interacting with Kraken's WebSocket and REST API."""
 
     WS_URL = "wss://ws.kraken.com"
+    WS_MAX_QUEUE = 256  # frames buffered by websockets before reads pause
     REST_API_URL = "https://api.kraken.com/0/public"
     ASSET_MAPPING = {
         "BTC": "XBT",
@@ -19,29 +48,54 @@ class KrakenClient:
         "USD": "USD",
         "EUR": "EUR"
     }
+    REVERSE_ASSET_MAPPING = {kraken: standard for standard, kraken in ASSET_MAPPING.items()}
+    OHLC_INTERVALS = frozenset({1, 5, 15, 30, 60, 240, 1440})
+    MAX_CONCURRENT_REQUESTS = 8
+    REST_TIMEOUT = 10
+    MAX_RECONNECT_DELAY = 60  # seconds, before jitter
 
     def __init__(self):
         """Initialize WebSocket client."""
         self.ws = None
         self.running = False
         self.subscriptions: Set[str] = set()
+        self._standard_symbols: Dict[str, str] = {}
+        self._last_ticks: Dict[str, tuple] = {}
+        self._resubscribe_frame: Optional[str] = None
         self.price_data: Dict[str, Dict] = {}
         self.on_price_update: Optional[Callable] = None
         self._message_handler_task = None
+        self._channel_handlers: Dict[str, Callable[[List], None]] = {
+            "ticker": self._handle_ticker,
+        }
+        self._http_session: Optional[aiohttp.ClientSession] = None
+
+    @cached_property
+    def _ssl_context(self) -> ssl.SSLContext:
+        """Certificate-verifying SSL context shared by the WebSocket and REST connections."""
+        return ssl.create_default_context()
 
     async def connect(self) -> bool:
         """Establish WebSocket connection."""
         try:
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-
-            self.ws = await websockets.connect(self.WS_URL, ssl=ssl_context)
+            # Ticker frames are small, so permessage-deflate costs more CPU than it saves
+            self.ws = await websockets.connect(
+                self.WS_URL,
+                ssl=self._ssl_context,
+                compression=None,
+                max_queue=self.WS_MAX_QUEUE,
+                # Rely on the library's keepalive instead of probing liveness ourselves
+                ping_interval=20,
+                ping_timeout=10,
+                max_size=2**16
+            )
             self.running = True
 
-            # Resubscribe to previous subscriptions
-            for symbol in self.subscriptions:
-                await self._subscribe_to_symbol(symbol)
+            # Resubscribe to previous subscriptions in a single frame
+            if self._standard_symbols:
+                if self._resubscribe_frame is None:
+                    self._resubscribe_frame = self._ticker_subscription(list(self._standard_symbols))
+                await self.ws.send(self._resubscribe_frame)
 
             # Start message handler task
             if not self._message_handler_task or self._message_handler_task.done():
@@ -49,7 +103,7 @@ class KrakenClient:
 
             return True
         except Exception as e:
-            print(f"Connection failed: {e}")
+            logger.warning("Connection failed: %s", e)
             return False
 
     async def subscribe_prices(self, symbols: List[str]) -> None:
@@ -57,23 +111,30 @@ class KrakenClient:
         if not self.ws:
             success = await self.connect()
             if not success:
-                print("Failed to connect to WebSocket API")
+                logger.error("Failed to connect to WebSocket API")
                 return
 
+        pairs: Dict[str, str] = {}
         for symbol in symbols:
-            await self._subscribe_to_symbol(symbol)
-
-    async def _subscribe_to_symbol(self, symbol: str) -> None:
-        """Subscribe to ticker data for a symbol."""
-        formatted_symbol = self._format_symbol(symbol)
-        if formatted_symbol not in self.subscriptions:
-            message = {
-                "event": "subscribe",
-                "pair": [formatted_symbol],
-                "subscription": {"name": "ticker"}
-            }
-            await self.ws.send(json.dumps(message))
-            self.subscriptions.add(formatted_symbol)
+            formatted_symbol = self._format_symbol(symbol)
+            if formatted_symbol not in self.subscriptions:
+                pairs.setdefault(formatted_symbol, symbol)
+        if not pairs:
+            return
+
+        await self.ws.send(self._ticker_subscription(list(pairs)))
+        self._standard_symbols.update(pairs)
+        self.subscriptions.update(pairs)
+        self._resubscribe_frame = None
+
+    @staticmethod
+    def _ticker_subscription(pairs: List[str]) -> str:
+        """Serialize one ticker subscribe frame covering all given pairs."""
+        return _json_dumps({
+            "event": "subscribe",
+            "pair": pairs,
+            "subscription": {"name": "ticker"}
+        })
 
     async def _message_handler(self) -> None:
         """Handle incoming WebSocket messages."""
@@ -81,61 +142,94 @@ class KrakenClient:
             if not self.ws:
                 success = await self.connect()
                 if not success:
-                    print("Failed to reconnect, stopping message handler.")
+                    logger.error("Failed to reconnect, stopping message handler.")
                     self.running = False
                     break
 
             try:
-                message = await self.ws.recv()
-                await self._process_message(message)
+                # Read frames as raw bytes: the JSON decoder accepts them directly,
+                # so websockets doesn't need to UTF-8 decode every text frame.
+                while True:
+                    message = await self.ws.recv(decode=False)
+                    await self._process_message(message)
             except websockets.exceptions.ConnectionClosed:
-                print("WebSocket connection closed. Attempting to reconnect...")
-                await asyncio.sleep(2)
-                await self.connect()
+                pass
             except Exception as e:
-                print(f"Error processing message: {e}")
+                logger.warning("Error processing message: %s", e)
                 await asyncio.sleep(1)
+                continue
+
+            if self.running:
+                logger.info("WebSocket connection closed. Attempting to reconnect...")
+                # Only returns without a connection once close() has stopped the client
+                await self._reconnect()
+
+    async def _reconnect(self) -> bool:
+        """Retry the connection with capped exponential backoff until it succeeds or the client stops."""
+        attempt = 0
+        while self.running:
+            # Jitter keeps clients from reconnecting in lockstep after an outage
+            await asyncio.sleep(min(2 ** attempt, self.MAX_RECONNECT_DELAY) * random.uniform(0.5, 1.5))
+            if not self.running:
+                break
+            if await self.connect():
+                return True
+            attempt += 1
+            logger.warning("Reconnect attempt %d failed", attempt)
+        return False
 
-    async def _process_message(self, message: str) -> None:
+    async def _process_message(self, message: Union[str, bytes]) -> None:
         """Process incoming WebSocket message."""
-        if not message:
+        if not message or message in _HEARTBEAT_FRAMES:
             return
 
         try:
-            data = json.loads(message)
-
-            # Handle ticker updates (price data)
-            if isinstance(data, list) and len(data) > 2 and data[2] == "ticker":
-                symbol = data[3]
-                price_data = data[1]
-
-                if "c" in price_data:
-                    standard_symbol = self._reverse_format_symbol(symbol)
-
-                    # Update price cache
-                    self.price_data[standard_symbol] = {
-                        "price": Decimal(price_data["c"][0]),
-                        "timestamp": int(time.time() * 1000),
-                        "volume": Decimal(price_data["v"][1]),
-                        "low": Decimal(price_data["l"][1]),
-                        "high": Decimal(price_data["h"][1]),
-                    }
+            data = _json_loads(message)
 
-                    # Call the callback if registered
-                    if self.on_price_update:
-                        update = {
-                            "symbol": standard_symbol,
-                            "data": self.price_data[standard_symbol]
-                        }
-                        self.on_price_update(update)
+            # Channel messages are [channelID, payload..., channelName, pair]
+            if type(data) is list and len(data) >= 4:
+                handler = self._channel_handlers.get(data[-2])
+                if handler:
+                    handler(data)
 
         except Exception as e:
-            print(f"Error processing message: {e}")
+            logger.warning("Error processing message: %s", e)
+
+    def _handle_ticker(self, data: List) -> None:
+        """Update the price cache from a ticker message."""
+        try:
+            close, volume, low, high = _TICKER_FIELDS(data[1])
+        except KeyError:
+            return
+
+        # Frames repeating the last price and volume carry nothing new
+        symbol = data[-1]
+        tick = (close[0], volume[1])
+        if self._last_ticks.get(symbol) == tick:
+            return
+        self._last_ticks[symbol] = tick
+
+        standard_symbol = self._standard_symbols.get(symbol) or self._reverse_format_symbol(symbol)
+
+        # Update the symbol's cache slot in place; Decimal is only built in get_latest_price
+        entry = self.price_data.get(standard_symbol)
+        if entry is None:
+            entry = self.price_data[standard_symbol] = {}
+        entry["price"] = float(close[0])
+        entry["timestamp"] = time.time_ns() // 1_000_000
+        entry["volume"] = float(volume[1])
+        entry["low"] = float(low[1])
+        entry["high"] = float(high[1])
+
+        # Call the callback if registered
+        callback = self.on_price_update
+        if callback:
+            callback({"symbol": standard_symbol, "data": entry})
 
     def get_latest_price(self, symbol: str) -> Optional[Decimal]:
         """Get the latest price for a symbol."""
         if symbol in self.price_data:
-            return self.price_data[symbol]["price"]
+            return _to_decimal(self.price_data[symbol]["price"])
         return None
 
     def get_multi_coin_data(self) -> Dict[str, Dict]:
@@ -144,88 +238,121 @@ class KrakenClient:
 
     async def fetch_historical_data(self, symbols, interval=5, limit=200):
         """Fetch historical OHLCV data from Kraken REST API."""
-        interval_map = {1: 1, 5: 5, 15: 15, 30: 30, 60: 60, 240: 240, 1440: 1440}
-        if interval not in interval_map:
-            interval = 5
+        kraken_interval = interval if interval in self.OHLC_INTERVALS else 5
+        session = self._get_http_session()
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+
+        results = await asyncio.gather(*(
+            self._fetch_symbol_history(session, semaphore, symbol, kraken_interval, limit)
+            for symbol in symbols
+        ))
 
-        kraken_interval = interval_map[interval]
         historical_data = {}
+        for symbol, candles in zip(symbols, results):
+            if candles is not None:
+                historical_data[symbol] = candles
+        return historical_data
 
-        for symbol in symbols:
-            try:
-                formatted_symbol = self._format_symbol(symbol)
-                endpoint = f"{self.REST_API_URL}/OHLC"
-                params = {
-                    "pair": formatted_symbol.replace("/", ""),
-                    "interval": kraken_interval
-                }
-
-                async with aiohttp.ClientSession() as session:
-                    ssl_context = ssl.create_default_context()
-                    ssl_context.check_hostname = False
-                    ssl_context.verify_mode = ssl.CERT_NONE
-
-                    async with session.get(endpoint, params=params, ssl=ssl_context) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            if "result" in data and data["error"] == [] and data["result"]:
-                                pair_data = list(data["result"].keys())[0]
-                                ohlc_data = data["result"][pair_data]
-
-                                historical_data[symbol] = []
-                                for candle in ohlc_data[-limit:]:
-                                    timestamp, open_price, high, low, close, vwap, vol, count = candle
-                                    historical_data[symbol].append({
-                                        "timestamp": int(timestamp),
-                                        "open": float(open_price),
-                                        "high": float(high),
-                                        "low": float(low),
-                                        "close": float(close),
-                                        "volume": float(vol)
-                                    })
-            except Exception as e:
-                print(f"Error fetching data for {symbol}: {e}")
+    async def _fetch_symbol_history(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        symbol: str,
+        kraken_interval: int,
+        limit: int
+    ) -> Optional[List[Dict]]:
+        """Fetch OHLCV candles for one symbol, returning None on failure."""
+        try:
+            formatted_symbol = self._format_symbol(symbol)
+            endpoint = f"{self.REST_API_URL}/OHLC"
+            params = {
+                "pair": formatted_symbol.replace("/", ""),
+                "interval": kraken_interval
+            }
 
-        return historical_data
+            async with semaphore:
+                async with session.get(endpoint, params=params) as response:
+                    if response.status != 200:
+                        logger.warning("OHLC fetch for %s failed: HTTP %s", symbol, response.status)
+                        return None
+                    data = _json_loads(await response.read())
+
+            if "result" in data and data["error"] == [] and data["result"]:
+                pair_data = list(data["result"].keys())[0]
+                ohlc_data = data["result"][pair_data]
+
+                return [
+                    {
+                        "timestamp": int(timestamp),
+                        "open": float(open_price),
+                        "high": float(high),
+                        "low": float(low),
+                        "close": float(close),
+                        "volume": float(vol)
+                    }
+                    for timestamp, open_price, high, low, close, vwap, vol, count in ohlc_data[-limit:]
+                ]
+
+            logger.warning("OHLC fetch for %s failed: %s", symbol, data.get("error"))
+        except Exception as e:
+            logger.warning("Error fetching data for %s: %s", symbol, e)
+
+        return None
 
-    def _format_symbol(self, symbol: str) -> str:
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """Return the shared REST session, creating it on first use."""
+        if self._http_session is None or self._http_session.closed:
+            connector = aiohttp.TCPConnector(
+                ssl=self._ssl_context,
+                limit=32,
+                limit_per_host=self.MAX_CONCURRENT_REQUESTS,
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            )
+            # Bound each request so one hung symbol cannot stall the whole gather
+            self._http_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.REST_TIMEOUT)
+            )
+        return self._http_session
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _format_symbol(cls, symbol: str) -> str:
         """Format trading pair symbol for Kraken API."""
         if not symbol or '/' not in symbol:
             return symbol
 
         base, quote = symbol.split('/')
-        base = self.ASSET_MAPPING.get(base, base)
-        quote = self.ASSET_MAPPING.get(quote, quote)
+        base = cls.ASSET_MAPPING.get(base, base)
+        quote = cls.ASSET_MAPPING.get(quote, quote)
         return f"{base}/{quote}"
 
-    def _reverse_format_symbol(self, symbol: str) -> str:
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _reverse_format_symbol(cls, symbol: str) -> str:
         """Convert Kraken symbol format back to standard format."""
         if not symbol or '/' not in symbol:
             return symbol
 
         base, quote = symbol.split('/')
-
-        # Reverse mapping
-        for standard, kraken in self.ASSET_MAPPING.items():
-            if kraken == base:
-                base = standard
-                break
-        for standard, kraken in self.ASSET_MAPPING.items():
-            if kraken == quote:
-                quote = standard
-                break
-
+        base = cls.REVERSE_ASSET_MAPPING.get(base, base)
+        quote = cls.REVERSE_ASSET_MAPPING.get(quote, quote)
         return f"{base}/{quote}"
 
     async def close(self) -> None:
-        """Close WebSocket connection gracefully."""
+        """Close the WebSocket connection and REST session gracefully."""
         self.running = False
         if self.ws:
             await self.ws.close()
             self.ws = None
 
         if self._message_handler_task:
-            await asyncio.sleep(0.1)
             if not self._message_handler_task.done():
                 self._message_handler_task.cancel()
-            self._message_handler_task = None
\ No newline at end of file
+            await asyncio.gather(self._message_handler_task, return_exceptions=True)
+            self._message_handler_task = None
+
+        if self._http_session:
+            await self._http_session.close()
+            self._http_session = None
\ No newline at end of file
@@ -1,42 +1,52 @@
 """Main entry point for trading bot."""
 from decimal import Decimal
 import asyncio
-import requests
+import logging
+import aiohttp
 from kraken_client import KrakenClient
 from trading_bot import TradingBot
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional, fall back to the stdlib codec
+    from json import loads as json_loads
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional and not available on Windows
+    uvloop = None
+
+# Stable coins to exclude from fetched pairs
+STABLE_COINS = frozenset({'USDT', 'USDC', 'DAI', 'BUSD', 'UST', 'EURT', 'TUSD', 'GUSD', 'PAX', 'HUSD', 'EURS'})
+
 async def get_all_kraken_pairs():
     """Fetch all available trading pairs from Kraken."""
-    # Define stable coins to exclude from fetched pairs
-    STABLE_COINS = {'USDT', 'USDC', 'DAI', 'BUSD', 'UST', 'EURT', 'TUSD', 'GUSD', 'PAX', 'HUSD', 'EURS'}
-
     try:
         print("Fetching available trading pairs from Kraken...")
 
-        # Use REST API to get available asset pairs
-        response = requests.get("https://api.kraken.com/0/public/AssetPairs")
-        if response.status_code != 200:
-            print("Warning: Failed to fetch trading pairs. Using default set.")
-            return ["BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT", "ADA/USDT"]
+        # Use REST API to get available asset pairs without blocking the event loop
+        timeout = aiohttp.ClientTimeout(total=10)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get("https://api.kraken.com/0/public/AssetPairs") as response:
+                if response.status != 200:
+                    print("Warning: Failed to fetch trading pairs. Using default set.")
+                    return ["BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT", "ADA/USDT"]
 
-        data = response.json()
+                data = json_loads(await response.read())
 
         if not data.get('result'):
             print("Warning: Invalid response from Kraken API. Using default set.")
             return ["BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT", "ADA/USDT"]
 
         # Filter for USDT pairs, excluding stable/stable pairs
-        usdt_pairs = []
-
-        for pair_name, pair_data in data['result'].items():
-            if 'USDT' in pair_name:
-                base = pair_data.get('base', '')
-                quote = pair_data.get('quote', '')
-
-                if base and quote and len(base) < 10 and len(quote) < 10:
-                    if quote == 'USDT' and base not in STABLE_COINS:
-                        standard_pair = f"{base}/{quote}"
-                        usdt_pairs.append(standard_pair)
+        usdt_pairs = [
+            f"{pair_data['base']}/USDT"
+            for pair_data in data['result'].values()
+            if pair_data.get('quote') == 'USDT'
+            and pair_data.get('base')
+            and len(pair_data['base']) < 10
+            and pair_data['base'] not in STABLE_COINS
+        ]
 
         # If no USDT pairs found, return default set
         if not usdt_pairs:
@@ -148,8 +158,13 @@ async def run_bot():
 
 def main():
     """Entry point."""
+    # Client diagnostics go through logging; keep them as plain console lines
+    logging.basicConfig(format="%(message)s", level=logging.INFO)
     try:
-        asyncio.run(run_bot())
+        if uvloop is not None:
+            uvloop.run(run_bot())
+        else:
+            asyncio.run(run_bot())
     except KeyboardInterrupt:
         print("\nBot stopped by user.")
     except Exception as e:
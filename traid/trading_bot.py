@@ -1,6 +1,9 @@
+from collections import deque
 from decimal import Decimal
 from typing import Dict, List, Optional
+from operator import itemgetter
 import asyncio
+import heapq
 import time
 import numpy as np
 
@@ -9,6 +12,7 @@ class TradingBot:
     """Unified trading bot supporting single-coin or multi-coin trading."""
 
     STABLE_COINS = {'USDT', 'USDC', 'DAI', 'BUSD', 'UST', 'EURT', 'TUSD', 'GUSD', 'PAX', 'HUSD', 'EURS'}
+    HISTORY_LENGTH = 50  # data points kept per symbol for analysis
 
     def __init__(
         self,
@@ -36,7 +40,7 @@ class TradingBot:
         self.active_symbol = self.symbols[0] if self.single_coin_mode and self.symbols else None
         self.positions: Dict[str, Decimal] = {}
         self.execution_history: Dict[str, List[Dict]] = {symbol: [] for symbol in self.symbols}
-        self.current_prices: Dict[str, Decimal] = {}
+        self.current_prices: Dict[str, float] = {}
 
         # Each symbol’s allocated balance, if single coin mode,
         # we allocate the entire initial balance to the first symbol.
@@ -48,6 +52,8 @@ class TradingBot:
         # Data for technical analysis
         self.coin_data: Dict[str, Dict] = {}
         self.opportunity_scores: Dict[str, int] = {}
+        # Symbols whose history changed since their score was last computed
+        self._dirty: Dict[str, bool] = {}
 
         # Flags and tasks
         self.is_running = False
@@ -70,26 +76,31 @@ class TradingBot:
     def _handle_price_update(self, update: Dict) -> None:
         """Handle live price updates from the client."""
         symbol = update["symbol"]
-        price = update["data"]["price"]
-        volume = update["data"]["volume"]
+        data = update["data"]
+        price = data["price"]
+        volume = data["volume"]
 
         self.current_prices[symbol] = price
         self._update_coin_data(symbol, price, volume)
 
-    def _update_coin_data(self, symbol: str, price: Decimal, volume: Decimal) -> None:
+    def _update_coin_data(self, symbol: str, price: float, volume: float) -> None:
         """Maintain a rolling history of prices/volumes/timestamps for analysis."""
         if symbol not in self.coin_data:
-            self.coin_data[symbol] = {'prices': [], 'volumes': [], 'timestamps': []}
+            self.coin_data[symbol] = self._new_coin_history([], [], [])
 
+        # Bounded deques drop the oldest point once HISTORY_LENGTH is reached
         self.coin_data[symbol]['prices'].append(float(price))
         self.coin_data[symbol]['volumes'].append(float(volume))
         self.coin_data[symbol]['timestamps'].append(int(time.time()))
-
-        # Keep only the last 50 data points
-        max_len = 50
-        for key in ['prices', 'volumes', 'timestamps']:
-            if len(self.coin_data[symbol][key]) > max_len:
-                self.coin_data[symbol][key] = self.coin_data[symbol][key][-max_len:]
+        self._dirty[symbol] = True
+
+    def _new_coin_history(self, prices, volumes, timestamps) -> Dict[str, deque]:
+        """Create the rolling price/volume/timestamp buffers for one symbol."""
+        return {
+            'prices': deque(prices, maxlen=self.HISTORY_LENGTH),
+            'volumes': deque(volumes, maxlen=self.HISTORY_LENGTH),
+            'timestamps': deque(timestamps, maxlen=self.HISTORY_LENGTH)
+        }
 
     async def start(self) -> None:
         """Begin trading: connect to client, fetch history, start loops."""
@@ -107,16 +118,17 @@ class TradingBot:
 
         print("📊 Fetching historical data...")
         historical_data = await self.client.fetch_historical_data(
-            symbols=self.symbols, interval=5, limit=50
+            symbols=self.symbols, interval=5, limit=self.HISTORY_LENGTH
         )
 
         # Load historical data
         for symbol, ohlcv_data in historical_data.items():
-            self.coin_data[symbol] = {
-                'prices': [candle['close'] for candle in ohlcv_data],
-                'volumes': [candle['volume'] for candle in ohlcv_data],
-                'timestamps': [candle['timestamp'] for candle in ohlcv_data]
-            }
+            self.coin_data[symbol] = self._new_coin_history(
+                (candle['close'] for candle in ohlcv_data),
+                (candle['volume'] for candle in ohlcv_data),
+                (candle['timestamp'] for candle in ohlcv_data)
+            )
+            self._dirty[symbol] = True
 
         # Calculate initial scores and choose an active symbol (multi-coin mode)
         self._calculate_opportunity_scores()
@@ -220,6 +232,11 @@ class TradingBot:
     def _calculate_opportunity_scores(self) -> Dict[str, int]:
         """Calculate and store opportunity scores for all symbols."""
         for symbol, data in self.coin_data.items():
+            # Untouched history would produce the same score again
+            if not self._dirty.get(symbol, True) and symbol in self.opportunity_scores:
+                continue
+            self._dirty[symbol] = False
+
             if len(data['prices']) < 10:
                 self.opportunity_scores[symbol] = 50
                 continue
@@ -282,12 +299,14 @@ class TradingBot:
         if len(prices) < period + 1:
             return 50
 
-        deltas = np.diff(prices)
+        # The averages below only use the oldest `period` deltas of the history (a
+        # known quirk, left as is), so diffing the newer points would be wasted work
+        deltas = np.diff(prices[:period + 1])
         gains = np.where(deltas > 0, deltas, 0)
         losses = np.where(deltas < 0, -deltas, 0)
 
-        avg_gain = np.mean(gains[:period])
-        avg_loss = np.mean(losses[:period])
+        avg_gain = gains.mean()
+        avg_loss = losses.mean()
         if avg_loss == 0:
             return 100
 
@@ -296,7 +315,7 @@ class TradingBot:
 
     def _get_top_opportunities(self, top_n: int = 3) -> List:
         """Return a sorted list of the highest scoring symbols."""
-        return sorted(self.opportunity_scores.items(), key=lambda x: x[1], reverse=True)[:top_n]
+        return heapq.nlargest(top_n, self.opportunity_scores.items(), key=itemgetter(1))
 
     def _get_best_opportunity(self) -> Optional[str]:
         """Return the single best coin according to current scores."""